@@ -36,10 +36,10 @@ if not st.session_state.email_entered:
             st.error("Please enter a valid email address.")
     st.stop()
     
-import time
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import altair as alt
+from dispatch_kernel import run_strategy
 
 
 
@@ -87,12 +87,13 @@ night_demand = st.sidebar.slider("12am–6am Demand (kW)", 0.0, 10.0, 1.0)
 
 # Strategy Select
 st.sidebar.header("🧠 Strategy Selection")
-strategy_choice = st.sidebar.selectbox("Choose Dispatch Strategy", [
+STRATEGIES = [
     "Blended (Price + Carbon)",
     "Tariff Avoidance Only",
     "Price Arbitrage",
     "Carbon Minimizer"
-])
+]
+strategy_choice = st.sidebar.selectbox("Choose Dispatch Strategy", STRATEGIES)
 
 st.sidebar.subheader("🎛️ Animation Settings")
 frame_delay = st.sidebar.slider("Frame Speed (seconds per frame)", 0.05, 1.0, 0.2, 0.05)
@@ -113,98 +114,110 @@ battery_config = {
     "tariff_threshold": tariff_threshold
 }
 
-def generate_daily_cycle(amplitude, base, noise, phase_shift=0):
-    intervals = np.arange(96)
-    hours = intervals / 4
-    cycle = base + amplitude * np.sin((hours - phase_shift) * np.pi / 12)
-    noise_component = np.random.normal(0, noise, size=96)
+# Hour of day for each 15-minute interval
+HOURS = np.arange(96) / 4
+
+@st.cache_data
+def generate_daily_cycle(amplitude, base, noise, phase_shift=0, seed=0):
+    rng = np.random.default_rng(seed)
+    cycle = base + amplitude * np.sin((HOURS - phase_shift) * np.pi / 12)
+    noise_component = rng.standard_normal(96) * noise
     return np.clip(cycle + noise_component, 0, None)
 
 def generate_user_demand():
-    profile = []
-    for interval in range(96):
-        hour = interval / 4
-        if 6 <= hour < 12:
-            demand = morning_demand
-        elif 12 <= hour < 18:
-            demand = afternoon_demand
-        elif 18 <= hour < 24:
-            demand = evening_demand
-        else:
-            demand = night_demand
-        # Scale for 15-minute demand (kWh)
-        demand_kWh = demand * 0.25
-        profile.append(demand_kWh / battery_capacity_kWh)
-    return profile
-
-if "last_region" not in st.session_state or st.session_state["last_region"] != region:
-    st.session_state["prices"] = generate_daily_cycle(profile["price_amp"], profile["price_base"], profile["noise"], phase_shift=18)
-    st.session_state["carbon"] = generate_daily_cycle(profile["carbon_amp"], profile["carbon_base"], profile["noise"], phase_shift=16)
-    st.session_state["timestamps"] = pd.date_range("2025-01-01", periods=96, freq="15min")
-    st.session_state["last_region"] = region
-
-prices = st.session_state["prices"]
-carbon = st.session_state["carbon"]
+    demand = np.select(
+        [(HOURS >= 6) & (HOURS < 12), (HOURS >= 12) & (HOURS < 18), (HOURS >= 18) & (HOURS < 24)],
+        [morning_demand, afternoon_demand, evening_demand],
+        default=night_demand
+    )
+    # Scale for 15-minute demand (kWh)
+    return demand * 0.25 / battery_capacity_kWh
+
+# Seed the synthetic series per region so reruns reproduce them exactly
+region_seed = 2 * list(region_profiles).index(region)
+
+if "timestamps" not in st.session_state:
+    st.session_state["timestamps"] = pd.date_range("2025-01-01", periods=96, freq="15min", name="timestamp")
+
+prices = generate_daily_cycle(profile["price_amp"], profile["price_base"], profile["noise"], phase_shift=18, seed=region_seed)
+carbon = generate_daily_cycle(profile["carbon_amp"], profile["carbon_base"], profile["noise"], phase_shift=16, seed=region_seed + 1)
 user_demand_profile = generate_user_demand()
 time_range = st.session_state["timestamps"]
 
-def update_soc(soc, action, config, demand_kWh):
-    step = config["step_size"]
-    soc -= config["passive_discharge"]
-    soc -= demand_kWh
-    soc = max(0.0, soc)
-    if action == "charge":
-        soc = min(1.0, soc + step * config["charge_efficiency"])
-    elif action == "discharge":
-        soc = max(0.0, soc - step / config["discharge_efficiency"])
-    return soc
-
-def dispatch_strategy(prices, carbon, user_demand, soc, config, strategy):
-    schedule = []
-    for t, (p, c, demand_kWh) in enumerate(zip(prices, carbon, user_demand)):
-        if strategy == "Tariff Avoidance Only":
-            action = "charge" if p < config["tariff_threshold"] and soc < 1.0 else "idle"
-        elif strategy == "Price Arbitrage":
-            action = "charge" if p < 80 and soc < 1.0 else "discharge" if p > 150 and soc > 0.2 else "idle"
-        elif strategy == "Carbon Minimizer":
-            action = "charge" if c < 200 and soc < 1.0 else "discharge" if c > 400 and soc > 0.2 else "idle"
-        else:
-            price_score = 1 - (p - min(prices)) / (max(prices) - min(prices))
-            carbon_score = 1 - (c - min(carbon)) / (max(carbon) - min(carbon))
-            blended_score = 0.5 * carbon_score + 0.5 * price_score
-            if blended_score > 0.7 and soc < 1.0:
-                action = "charge"
-            elif blended_score < 0.3 and soc > 0.2:
-                action = "discharge"
-            else:
-                action = "idle"
-
-        schedule.append({
-            "time": t,
-            "timestamp": time_range[t],
-            "action": action,
-            "price": p,
-            "carbon": c,
-            "soc": soc,
-            "user_demand_kWh": demand_kWh * battery_capacity_kWh,
-            "grid_energy_kWh": 0
-        })
-
-        before_soc = soc
-        soc = update_soc(soc, action, config, demand_kWh)
-        after_soc = soc
-        schedule[-1]["grid_energy_kWh"] = abs(after_soc - before_soc) * battery_capacity_kWh
-
-    return pd.DataFrame(schedule)
+# Action codes returned by the kernel, indexed by code + 1 for display
+ACTION_LABELS = ["discharge", "idle", "charge"]
+ACTION_COLORS = np.array(["red", "gray", "blue"])
+
+@st.cache_resource
+def warm_up_kernels():
+    # dispatch_kernel stays in sys.modules across reruns, so compiling (or loading from
+    # the numba cache) here happens once per server process, with the argument types
+    # dispatch_strategy passes
+    flags = np.zeros(4, dtype=np.bool_)
+    run_strategy(flags, flags, np.zeros(4), 0.5, 0.1, 0.0, 0.95, 0.9, 1.0)
+
+warm_up_kernels()
+
+def dispatch_strategy(prices, carbon, user_demand, soc, config, strategy, capacity_kWh, timestamps):
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    carbon = np.ascontiguousarray(carbon, dtype=np.float64)
+    user_demand = np.ascontiguousarray(user_demand, dtype=np.float64)
+    n = len(prices)
+
+    # Candidate actions for every step depend only on price/carbon; the kernel applies the SOC limits
+    if strategy == "Tariff Avoidance Only":
+        want_charge = prices < config["tariff_threshold"]
+        want_discharge = np.zeros(n, dtype=np.bool_)
+    elif strategy == "Price Arbitrage":
+        want_charge = prices < 80
+        want_discharge = prices > 150
+    elif strategy == "Carbon Minimizer":
+        want_charge = carbon < 200
+        want_discharge = carbon > 400
+    else:
+        pmin, pmax = prices.min(), prices.max()
+        cmin, cmax = carbon.min(), carbon.max()
+        price_score = 1 - (prices - pmin) / (pmax - pmin)
+        carbon_score = 1 - (carbon - cmin) / (cmax - cmin)
+        blended_score = 0.5 * carbon_score + 0.5 * price_score
+        want_charge = blended_score > 0.7
+        want_discharge = blended_score < 0.3
+
+    actions, soc_values, grid_energy = run_strategy(
+        want_charge, want_discharge, user_demand, float(soc),
+        float(config["step_size"]), float(config["passive_discharge"]),
+        float(config["charge_efficiency"]), float(config["discharge_efficiency"]),
+        float(capacity_kWh)
+    )
+
+    return pd.DataFrame({
+        "action": pd.Categorical.from_codes(actions + 1, categories=ACTION_LABELS),
+        "price": prices,
+        "carbon": carbon,
+        "soc": soc_values,
+        "grid_energy_kWh": grid_energy
+    }, index=timestamps[:n])
+
+@st.cache_data(max_entries=64, hash_funcs={pd.DatetimeIndex: lambda index: index.asi8})
+def run_all_strategies(prices, carbon, user_demand, soc, config, capacity_kWh, timestamps):
+    return {
+        strategy: dispatch_strategy(prices, carbon, user_demand, soc, config, strategy, capacity_kWh, timestamps)
+        for strategy in STRATEGIES
+    }
 
 soc_start = 0.5
-df_schedule = dispatch_strategy(prices, carbon, user_demand_profile, soc_start, battery_config, strategy_choice)
+all_schedules = run_all_strategies(prices, carbon, user_demand_profile, soc_start, battery_config,
+                                   battery_capacity_kWh, time_range)
+df_schedule = all_schedules[strategy_choice]
+# Demand is the same for every strategy, so it is scaled here once instead of stored in each cached schedule
+user_demand_kWh = user_demand_profile * battery_capacity_kWh
 
 # ======== Summary Stats ========
-total_energy_used = df_schedule["grid_energy_kWh"].sum()
-total_cost = (df_schedule["price"] * df_schedule["grid_energy_kWh"] / 1000).sum()
-total_emissions = (df_schedule["carbon"] * df_schedule["grid_energy_kWh"] / 1000).sum()
-high_tariff_intervals = df_schedule[df_schedule["price"] > tariff_threshold].shape[0]
+grid = df_schedule["grid_energy_kWh"].to_numpy()
+total_energy_used = grid.sum()
+total_cost = np.dot(prices, grid) / 1000
+total_emissions = np.dot(carbon, grid) / 1000
+high_tariff_intervals = int((prices > tariff_threshold).sum())
 
 st.subheader("📈 Strategy Summary")
 st.markdown(f"""
@@ -216,67 +229,64 @@ st.markdown(f"""
 """)
 
 # ======== Visualization ========
+# Vega renders these charts client-side, so the server only builds a small spec
+def line_panel(data, column, title, color, height=180):
+    return alt.Chart(data).mark_line(color=color).encode(
+        x=alt.X("timestamp:T", title="Time"), y=alt.Y(f"{column}:Q", title=title)
+    ).properties(height=height)
+
 col1, col2 = st.columns([2, 1])
 
 with col1:
     st.subheader("📊 Simulation Results")
-    fig, axs = plt.subplots(4, 1, figsize=(10, 10), sharex=True)
-    axs[0].plot(time_range, df_schedule["price"], label="Price (£/MWh)")
-    axs[0].set_ylabel("Price")
-    axs[0].legend()
-    axs[1].plot(time_range, df_schedule["carbon"], label="Carbon Intensity (gCO₂/kWh)", color="green")
-    axs[1].set_ylabel("Carbon")
-    axs[1].legend()
-    axs[2].plot(time_range, df_schedule["user_demand_kWh"], label="User Demand (kWh)", color="orange")
-    axs[2].set_ylabel("Demand")
-    axs[2].legend()
-    axs[3].plot(time_range, df_schedule["soc"], label="State of Charge", color="purple")
-    action_colors = df_schedule["action"].map({"charge": "blue", "discharge": "red", "idle": "gray"})
-    action_vals = df_schedule["action"].map({"charge": 1, "discharge": -1, "idle": 0})
-    axs[3].scatter(time_range, action_vals, color=action_colors, label="Action", zorder=3)
-    axs[3].set_ylabel("SOC / Action")
-    axs[3].legend()
-    plt.xlabel("Time")
-    plt.tight_layout()
-    st.pyplot(fig)
+    results = df_schedule[["price", "carbon", "soc", "action"]].assign(
+        user_demand_kWh=user_demand_kWh, action_code=df_schedule["action"].cat.codes - 1
+    ).reset_index()
+    soc_panel = line_panel(results, "soc", "SOC / Action", "purple") + alt.Chart(results).mark_circle(size=40).encode(
+        x="timestamp:T",
+        y="action_code:Q",
+        color=alt.Color("action:N", title="Action",
+                        scale=alt.Scale(domain=ACTION_LABELS, range=list(ACTION_COLORS)))
+    )
+    st.altair_chart(alt.vconcat(
+        line_panel(results, "price", "Price (£/MWh)", "steelblue"),
+        line_panel(results, "carbon", "Carbon Intensity (gCO₂/kWh)", "green"),
+        line_panel(results, "user_demand_kWh", "User Demand (kWh)", "orange"),
+        soc_panel
+    ).resolve_scale(color="independent"))
 
 with col2:
     st.subheader("📋 Dispatch Log")
-    st.dataframe(df_schedule[["timestamp", "action", "price", "carbon", "user_demand_kWh", "grid_energy_kWh", "soc"]].style.format({
-        "price": "£{:.0f}",
-        "carbon": "{:.0f} g",
-        "soc": "{:.2f}",
-        "user_demand_kWh": "{:.2f}",
-        "grid_energy_kWh": "{:.2f}"
-    }))
+    st.dataframe(df_schedule.assign(user_demand_kWh=user_demand_kWh)[["action", "price", "carbon", "user_demand_kWh", "grid_energy_kWh", "soc"]], column_config={
+        "price": st.column_config.NumberColumn(format="£%.0f"),
+        "carbon": st.column_config.NumberColumn(format="%.0f g"),
+        "soc": st.column_config.NumberColumn(format="%.2f"),
+        "user_demand_kWh": st.column_config.NumberColumn(format="%.2f"),
+        "grid_energy_kWh": st.column_config.NumberColumn(format="%.2f")
+    })
 
 # === Compare All Strategies ===
 st.subheader("🧠 Strategy Comparison Overview")
 
-def run_all_strategies():
-    strategies = [
-        "Blended (Price + Carbon)",
-        "Tariff Avoidance Only",
-        "Price Arbitrage",
-        "Carbon Minimizer"
-    ]
-    comparison = []
-    for strategy in strategies:
-        df = dispatch_strategy(prices, carbon, user_demand_profile, soc_start, battery_config, strategy)
-        total_energy = df["grid_energy_kWh"].sum()
-        total_cost = (df["price"] * df["grid_energy_kWh"] / 1000).sum()
-        total_emissions = (df["carbon"] * df["grid_energy_kWh"] / 1000).sum()
-        high_tariff_hours = df[df["price"] > tariff_threshold].shape[0]
-        comparison.append({
-            "Strategy": strategy,
-            "Energy (kWh)": round(total_energy, 2),
-            "Cost (£)": round(total_cost, 2),
-            "CO₂ (kg)": round(total_emissions, 2),
-            "Tariff Hours Avoided": 24 - high_tariff_hours
-        })
-    return pd.DataFrame(comparison)
-
-df_all_strategies = run_all_strategies()
+def compare_strategies(schedules):
+    # Prices and carbon are shared by every strategy, so their reductions sit outside the loop
+    price_arr = np.asarray(prices, dtype=float)
+    carbon_arr = np.asarray(carbon, dtype=float)
+    high_tariff_hours = int((price_arr > tariff_threshold).sum())
+    # One row of grid energy per strategy, so each summary is a single reduction over all strategies
+    grid_mat = np.stack([schedules[strategy]["grid_energy_kWh"].to_numpy() for strategy in STRATEGIES])
+    total_energy = grid_mat.sum(axis=1)
+    total_cost = grid_mat @ price_arr / 1000
+    total_emissions = grid_mat @ carbon_arr / 1000
+    return pd.DataFrame({
+        "Strategy": STRATEGIES,
+        "Energy (kWh)": total_energy.round(2),
+        "Cost (£)": total_cost.round(2),
+        "CO₂ (kg)": total_emissions.round(2),
+        "Tariff Hours Avoided": 24 - high_tariff_hours
+    })
+
+df_all_strategies = compare_strategies(all_schedules)
 best_by_cost = df_all_strategies["Cost (£)"].idxmin()
 best_by_emissions = df_all_strategies["CO₂ (kg)"].idxmin()
 
@@ -285,11 +295,12 @@ df_all_strategies.loc[best_by_cost, "🏆 Best (Cost)"] = "✅"
 df_all_strategies["🏆 Best (Carbon)"] = ""
 df_all_strategies.loc[best_by_emissions, "🏆 Best (Carbon)"] = "✅"
 
-st.dataframe(df_all_strategies.style.format({
-    "Cost (£)": "£{:.2f}",
-    "CO₂ (kg)": "{:.2f}",
-    "Energy (kWh)": "{:.2f}"
-}).highlight_min(subset=["Cost (£)", "CO₂ (kg)"], color="lightgreen"))
+# The 🏆 columns already mark the minimum cost/CO₂ rows, so no Styler highlighting is needed
+st.dataframe(df_all_strategies, column_config={
+    "Cost (£)": st.column_config.NumberColumn(format="£%.2f"),
+    "CO₂ (kg)": st.column_config.NumberColumn(format="%.2f"),
+    "Energy (kWh)": st.column_config.NumberColumn(format="%.2f")
+})
 
 st.caption("✅ This summary helps identify the most cost-effective and carbon-efficient strategy based on your grid conditions and load profile.")
 
@@ -307,116 +318,97 @@ if reset_col.button("🔁 Reset"):
     st.session_state.animating = False
     st.session_state.paused = False
     st.session_state.frame_idx = 0
-    
-action_placeholder = st.empty()
 
-if st.session_state.animating:
-    placeholder = st.empty()
-    explanation_placeholder = st.empty()
-    fig, axs = plt.subplots(5, 1, figsize=(10, 10), sharex=True)
-    action_colors = {"charge": "blue", "discharge": "red", "idle": "gray"}
-
-    while st.session_state.animating and st.session_state.frame_idx < len(df_schedule):
-        if st.session_state.paused:
-            time.sleep(0.1)
-            continue
-
-        i = st.session_state.frame_idx
-        current_row = df_schedule.iloc[i]
-
-        # Clear all axes
-        for ax in axs:
-            ax.clear()
-
-        # Plot variables
-        axs[0].plot(df_schedule["timestamp"][:i+1], df_schedule["price"][:i+1], label="Price (£/MWh)")
-        axs[0].set_ylabel("Price")
-        axs[0].legend()
-
-        axs[1].plot(df_schedule["timestamp"][:i+1], df_schedule["carbon"][:i+1], label="Carbon (gCO₂/kWh)", color="green")
-        axs[1].set_ylabel("Carbon")
-        axs[1].legend()
-
-        axs[2].plot(df_schedule["timestamp"][:i+1], df_schedule["user_demand_kWh"][:i+1], label="Demand (kWh)", color="orange")
-        axs[2].set_ylabel("Demand")
-        axs[2].legend()
-
-        axs[3].plot(df_schedule["timestamp"][:i+1], df_schedule["soc"][:i+1], label="SOC", color="purple")
-        axs[3].set_ylabel("SOC")
-        axs[3].legend()
-
-        # Render main chart
-        plt.tight_layout()
-        placeholder.pyplot(fig)
-        
-        # === Unified Compact STATUS BOX (Action + Emoji SOC Bar) with Fallbacks ===
-
-        # Safe extraction of current action
-        current_action = current_row.get("action", "idle")  # default to idle if missing
-        
-        # Define action text and color mapping
-        action_display = {
-            "charge": "🔵 <b>Charging</b><br><small>Storing cheap/clean energy</small>",
-            "discharge": "🔴 <b>Discharging</b><br><small>Meeting demand / high price</small>",
-            "idle": "⚪ <b>Idle</b><br><small>No action needed</small>"
-        }
-        action_color = {
-            "charge": "blue",
-            "discharge": "red",
-            "idle": "gray"
-        }
-        
-        # Fallback in case action key is invalid
-        action_text = action_display.get(current_action, action_display["idle"])
-        color = action_color.get(current_action, "gray")
-        
-        # Emoji-based SOC bar
-        soc_level = current_row.get("soc", 0.0)
-        total_blocks = 8
-        filled_blocks = int(round(soc_level * total_blocks))
-        empty_blocks = total_blocks - filled_blocks
-        emoji_bar = "🔋" * filled_blocks + "⚪️" * empty_blocks
-        
-        # Render the full box
-        status_html = f"""
-        <div style="
-            border-left: 6px solid {color};
-            padding: 0.8rem;
-            border-radius: 6px;
-            background-color: #f7f7f7;
-            font-size: 0.95rem;
-            margin-top: 0.5rem;
-        ">
-        <span style="color: {color}; font-weight: bold;">🧠 Action:</span>
-        {action_text}
-        <div style="margin-top: 0.5rem;"><b>Battery:</b> {emoji_bar} ({soc_level:.0%})</div>
-        </div>
-        """
-        
-        # Use a Streamlit placeholder to overwrite each frame
-        action_placeholder.markdown(status_html, unsafe_allow_html=True)
-
-        # Start explanation text from scratch each frame
-        explanation = f"### ⏱️ {current_row['timestamp'].strftime('%H:%M')}\n"
-        explanation += f"**Action:** `{current_row.get('action', 'idle').upper()}`\n\n"
-        explanation += f"• Price: £{current_row.get('price', 0):.1f} / MWh\n"
-        explanation += f"• Carbon: {current_row.get('carbon', 0):.1f} gCO₂/kWh\n"
-        explanation += f"• Demand: {current_row.get('user_demand_kWh', 0):.2f} kWh\n"
-        explanation += f"• SOC: {current_row.get('soc', 0):.2f}\n\n"
-        
-        strategy = strategy_choice
-        if strategy == "Tariff Avoidance Only":
-            explanation += f"🔍 Charging if price < £{tariff_threshold} (tariff threshold)\n"
-        elif strategy == "Price Arbitrage":
-            explanation += f"🔍 Charging if price < £80, discharging if price > £150\n"
-        elif strategy == "Carbon Minimizer":
-            explanation += f"🔍 Charging if carbon < 200, discharging if > 400\n"
-        else:
-            explanation += f"🔍 Blended strategy using price & carbon intensity\n"
-        
-        explanation_placeholder.markdown(explanation)
+# Status box text, indexed by action code + 1 like ACTION_LABELS
+action_display = (
+    "🔴 <b>Discharging</b><br><small>Meeting demand / high price</small>",
+    "⚪ <b>Idle</b><br><small>No action needed</small>",
+    "🔵 <b>Charging</b><br><small>Storing cheap/clean energy</small>"
+)
+
+# Long-form chart source for the animation, built once per script run; each tick only slices it
+animation_source = df_schedule[["price", "carbon", "soc"]].assign(user_demand_kWh=user_demand_kWh).reset_index()
 
+# Only the fragment reruns on each tick, so sidebar widgets stay responsive while animating
+@st.fragment(run_every=frame_delay if st.session_state.animating and not st.session_state.paused else None)
+def animation_frame():
+    if st.session_state.animating and not st.session_state.paused:
         st.session_state.frame_idx += 1
-        time.sleep(frame_delay)
+        if st.session_state.frame_idx >= len(df_schedule):
+            st.session_state.frame_idx = len(df_schedule)
+            st.session_state.animating = False
+            st.rerun()  # full rerun drops run_every now the animation has finished
 
-    st.session_state.animating = False  # Stop at the end
+    if st.session_state.frame_idx == 0:
+        return
+
+    action_placeholder = st.empty()
+    placeholder = st.empty()
+    explanation_placeholder = st.empty()
+
+    i = st.session_state.frame_idx - 1
+    current_row = df_schedule.iloc[i]
+
+    # Render main chart; only the rows played so far are sent and Vega draws them in the browser
+    frame = animation_source.iloc[:i+1]
+    placeholder.altair_chart(alt.vconcat(
+        line_panel(frame, "price", "Price (£/MWh)", "steelblue", height=120),
+        line_panel(frame, "carbon", "Carbon (gCO₂/kWh)", "green", height=120),
+        line_panel(frame, "user_demand_kWh", "Demand (kWh)", "orange", height=120),
+        line_panel(frame, "soc", "SOC", "purple", height=120)
+    ))
+    
+    # === Unified Compact STATUS BOX (Action + Emoji SOC Bar) with Fallbacks ===
+
+    # Categorical codes already follow ACTION_LABELS order, i.e. action code + 1
+    action_idx = int(df_schedule["action"].cat.codes.iat[i])
+    action_text = action_display[action_idx]
+    color = ACTION_COLORS[action_idx]
+
+    # Emoji-based SOC bar
+    soc_level = current_row.get("soc", 0.0)
+    total_blocks = 8
+    filled_blocks = int(round(soc_level * total_blocks))
+    empty_blocks = total_blocks - filled_blocks
+    emoji_bar = "🔋" * filled_blocks + "⚪️" * empty_blocks
+
+    # Render the full box
+    status_html = f"""
+    <div style="
+        border-left: 6px solid {color};
+        padding: 0.8rem;
+        border-radius: 6px;
+        background-color: #f7f7f7;
+        font-size: 0.95rem;
+        margin-top: 0.5rem;
+    ">
+    <span style="color: {color}; font-weight: bold;">🧠 Action:</span>
+    {action_text}
+    <div style="margin-top: 0.5rem;"><b>Battery:</b> {emoji_bar} ({soc_level:.0%})</div>
+    </div>
+    """
+
+    # Use a Streamlit placeholder to overwrite each frame
+    action_placeholder.markdown(status_html, unsafe_allow_html=True)
+
+    # Start explanation text from scratch each frame
+    explanation = f"### ⏱️ {current_row.name.strftime('%H:%M')}\n"
+    explanation += f"**Action:** `{current_row.get('action', 'idle').upper()}`\n\n"
+    explanation += f"• Price: £{current_row.get('price', 0):.1f} / MWh\n"
+    explanation += f"• Carbon: {current_row.get('carbon', 0):.1f} gCO₂/kWh\n"
+    explanation += f"• Demand: {user_demand_kWh[i]:.2f} kWh\n"
+    explanation += f"• SOC: {current_row.get('soc', 0):.2f}\n\n"
+
+    strategy = strategy_choice
+    if strategy == "Tariff Avoidance Only":
+        explanation += f"🔍 Charging if price < £{tariff_threshold} (tariff threshold)\n"
+    elif strategy == "Price Arbitrage":
+        explanation += f"🔍 Charging if price < £80, discharging if price > £150\n"
+    elif strategy == "Carbon Minimizer":
+        explanation += f"🔍 Charging if carbon < 200, discharging if > 400\n"
+    else:
+        explanation += f"🔍 Blended strategy using price & carbon intensity\n"
+
+    explanation_placeholder.markdown(explanation)
+
+animation_frame()
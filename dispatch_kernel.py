@@ -0,0 +1,39 @@
+import numpy as np
+from numba import njit
+
+# Kept out of app.py: Streamlit re-executes the script on every rerun, which would
+# rebuild these dispatchers and drop their compiled signatures each time
+
+@njit(cache=True)
+def update_soc(soc, action_code, charge_delta, discharge_delta, passive_discharge, demand_kWh):
+    soc -= passive_discharge
+    soc -= demand_kWh
+    soc = max(0.0, soc)
+    soc = soc + charge_delta * (action_code == 1) - discharge_delta * (action_code == -1)
+    return min(max(soc, 0.0), 1.0)
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def run_strategy(want_charge, want_discharge, demand, soc0, step, passive_discharge,
+                 charge_efficiency, discharge_efficiency, capacity_kWh):
+    n = demand.shape[0]
+    actions = np.empty(n, dtype=np.int8)
+    soc_values = np.empty(n)
+    grid_energy = np.empty(n)
+    charge_delta = step * charge_efficiency
+    discharge_delta = step / discharge_efficiency
+    soc = soc0
+    for t in range(n):
+        if want_charge[t] and soc < 1.0:
+            action = 1
+        elif want_discharge[t] and soc > 0.2:
+            action = -1
+        else:
+            action = 0
+        actions[t] = action
+        soc_values[t] = soc
+
+        next_soc = update_soc(soc, action, charge_delta, discharge_delta, passive_discharge, demand[t])
+        grid_energy[t] = abs(next_soc - soc)
+        soc = next_soc
+    grid_energy *= capacity_kWh
+    return actions, soc_values, grid_energy